@@ -1,10 +1,2 @@
-import graphene
-from crm.schema import Query as CRMQuery, Mutation as CRMMutation
-
-class Query(CRMQuery, graphene.ObjectType):
-    pass
-
-class Mutation(CRMMutation, graphene.ObjectType):
-    pass
-
-schema = graphene.Schema(query=Query, mutation=Mutation)
+# The project schema is the CRM schema; re-exported so it's only built once per process
+from crm.schema import Mutation, Query, schema  # noqa: F401
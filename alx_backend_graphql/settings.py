@@ -42,9 +42,17 @@ INSTALLED_APPS = [
     'django_filters',
 ]
 GRAPHENE = {
-    "SCHEMA": "crm.schema.schema"
+    "SCHEMA": "crm.schema.schema",
+    # Upper bound on rows per connection page when the client omits first/last
+    "RELAY_CONNECTION_MAX_LIMIT": 100,
 }
 
+# Opt-in caching of GraphQL query responses, in seconds (crm.cache). Only enable it with a CACHES
+# backend shared by every worker and every process that writes to the database (e.g. Redis via
+# django-redis): the default per-process LocMemCache would keep serving stale responses from
+# workers that didn't handle the write.
+# GRAPHQL_RESPONSE_CACHE_TIMEOUT = 300
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -83,6 +91,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Opening a SQLite connection is only a file open, so this saves little today; it is kept
+        # so each worker reuses its connection across requests once the project moves to a
+        # networked database such as PostgreSQL
+        'CONN_MAX_AGE': 60,
     }
 }
 
@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+RESPONSE_VERSION_KEY = "graphql:response:version"
+
+
+def response_cache_timeout():
+    """Seconds a query response stays cached, or None when response caching is off (the default).
+
+    Set GRAPHQL_RESPONSE_CACHE_TIMEOUT only when CACHES points at a backend every process shares.
+    """
+    return getattr(settings, "GRAPHQL_RESPONSE_CACHE_TIMEOUT", None) or None
+
+
+def response_cache_key(query, variables, operation_name):
+    """Cache key for a query response, scoped to the current response version."""
+    version = cache.get_or_set(RESPONSE_VERSION_KEY, 1, None)
+    digest = hashlib.sha256(
+        json.dumps([query, variables, operation_name], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"graphql:response:{version}:{digest}"
+
+
+def invalidate_responses():
+    """Orphan every cached query response by moving to a new response version."""
+    try:
+        cache.incr(RESPONSE_VERSION_KEY)
+    except ValueError:
+        cache.set(RESPONSE_VERSION_KEY, 1, None)
@@ -0,0 +1,97 @@
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from graphene.relay import PageInfo
+from graphene_django.fields import DjangoConnectionField
+from graphene_django.filter import DjangoFilterConnectionField
+
+KEYSET_PREFIX = "keyset:"
+
+
+def pk_to_cursor(pk):
+    return base64.b64encode(f"{KEYSET_PREFIX}{pk}".encode()).decode()
+
+
+def cursor_to_pk(cursor, model):
+    """Primary key encoded in a keyset cursor, or None for any other cursor (e.g. an offset one)."""
+    try:
+        value = base64.b64decode(cursor).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    if not value.startswith(KEYSET_PREFIX):
+        return None
+    try:
+        return model._meta.pk.to_python(value[len(KEYSET_PREFIX):])
+    except ValidationError:
+        return None
+
+
+class FilterConnectionField(DjangoFilterConnectionField):
+    """DjangoFilterConnectionField that skips the FilterSet when no filters are given.
+
+    Pages are fetched by primary key keyset: WHERE pk > <after> [AND pk < <before>] ORDER BY pk
+    LIMIT first + 1, or ORDER BY pk DESC LIMIT last + 1 when paging backwards, so deep pages
+    cost the same as the first one and no COUNT is run.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        if all(args.get(name) is None for name in filtering_args):
+            return DjangoConnectionField.resolve_queryset(connection, iterable, info, args)
+        return super().resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        first, last = args.get("first"), args.get("last")
+        after, before = args.get("after"), args.get("before")
+        model = getattr(iterable, "model", None)
+        after_pk = cursor_to_pk(after, model) if after and model else None
+        before_pk = cursor_to_pk(before, model) if before and model else None
+        # Offsets, first+last together, negative counts, explicit orderings and offset cursors
+        # keep the default slicing (and its errors)
+        if (
+            not isinstance(iterable, QuerySet)
+            or iterable.ordered
+            or args.get("offset") is not None
+            or (first is not None and last is not None)
+            or any(count is not None and count < 0 for count in (first, last))
+            or (first is None and last is None and max_limit is None)
+            or (after and after_pk is None)
+            or (before and before_pk is None)
+        ):
+            return super().resolve_connection(connection, args, iterable, max_limit)
+
+        queryset = iterable
+        if after_pk is not None:
+            queryset = queryset.filter(pk__gt=after_pk)
+        if before_pk is not None:
+            queryset = queryset.filter(pk__lt=before_pk)
+
+        # One extra row tells whether there is another page in the paging direction
+        if last is not None:
+            limit = last
+            rows = list(queryset.order_by("-pk")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+            has_previous_page, has_next_page = has_more, before_pk is not None
+        else:
+            limit = max_limit if first is None else first
+            rows = list(queryset.order_by("pk")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            has_previous_page, has_next_page = after_pk is not None, has_more
+
+        edges = [connection.Edge(node=row, cursor=pk_to_cursor(row.pk)) for row in rows]
+        page = connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        page.iterable = queryset
+        return page
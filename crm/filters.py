@@ -1,8 +1,47 @@
+import copy
+from collections import OrderedDict
+from functools import lru_cache
+
 import django_filters
+from django.utils.datastructures import MultiValueDict
 from .models import Customer, Product, Order
 
 
-class CustomerFilter(django_filters.FilterSet):
+class ShapeCachedFilterSet(django_filters.FilterSet):
+    """FilterSet that only sets up the filters a request actually gives.
+
+    The form class is built once per combination ("shape") of given filters rather than per
+    request, and only the given filters are copied, validated and applied.
+    """
+
+    def __init__(self, data=None, queryset=None, *, request=None, prefix=None):
+        if queryset is None:
+            queryset = self._meta.model._default_manager.all()
+
+        self.is_bound = data is not None
+        self.data = data or MultiValueDict()
+        self.queryset = queryset
+        self.request = request
+        self.form_prefix = prefix
+
+        self.filters = OrderedDict(
+            (name, copy.deepcopy(filter_)) for name, filter_ in self.base_filters.items() if name in self.data
+        )
+        for filter_ in self.filters.values():
+            filter_.model = queryset.model
+            filter_.parent = self
+
+    def get_form_class(self):
+        return self.form_class_for(frozenset(self.filters))
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def form_class_for(cls, shape):
+        fields = OrderedDict((name, filter_.field) for name, filter_ in cls.base_filters.items() if name in shape)
+        return type(f"{cls.__name__}Form", (cls._meta.form,), fields)
+
+
+class CustomerFilter(ShapeCachedFilterSet):
     # Case-insensitive partial match for name and email
     name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
     email = django_filters.CharFilter(field_name="email", lookup_expr="icontains")
@@ -22,7 +61,7 @@ class CustomerFilter(django_filters.FilterSet):
         fields = ["name", "email", "created_at__gte", "created_at__lte", "phone_pattern"]
 
 
-class ProductFilter(django_filters.FilterSet):
+class ProductFilter(ShapeCachedFilterSet):
     # Case-insensitive partial match
     name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
 
@@ -37,19 +76,19 @@ class ProductFilter(django_filters.FilterSet):
         fields = ["name", "price__gte", "price__lte", "stock__gte", "stock__lte"]
 
 
-class OrderFilter(django_filters.FilterSet):
+class OrderFilter(ShapeCachedFilterSet):
     # Range filters
     total_amount__gte = django_filters.NumberFilter(field_name="total_amount", lookup_expr="gte")
     total_amount__lte = django_filters.NumberFilter(field_name="total_amount", lookup_expr="lte")
     order_date__gte = django_filters.DateFilter(field_name="order_date", lookup_expr="gte")
     order_date__lte = django_filters.DateFilter(field_name="order_date", lookup_expr="lte")
 
-    # Related field lookups
+    # Related field lookups (M2M joins use distinct to avoid duplicate orders)
     customer_name = django_filters.CharFilter(field_name="customer__name", lookup_expr="icontains")
-    product_name = django_filters.CharFilter(field_name="products__name", lookup_expr="icontains")
+    product_name = django_filters.CharFilter(field_name="products__name", lookup_expr="icontains", distinct=True)
 
     # Filter by specific product ID
-    product_id = django_filters.NumberFilter(field_name="products__id")
+    product_id = django_filters.NumberFilter(field_name="products__id", distinct=True)
 
     class Meta:
         model = Order
@@ -0,0 +1,78 @@
+from .models import Customer, Product
+
+
+class ModelLoader:
+    """Per-request cache of model instances by primary key.
+
+    Loads are not deferred: load() fetches an uncached key on its own, and only the keys given
+    to one load_many() call share a single in_bulk() query. Keys from sibling resolvers are not
+    coalesced, since the sync view resolves each list item to completion before the next.
+    """
+
+    model = None
+
+    def __init__(self):
+        self._cache = {}
+
+    def __contains__(self, key):
+        return self.model._meta.pk.to_python(key) in self._cache
+
+    def load(self, key):
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        # Missing keys are fetched with a single WHERE id IN (...) query
+        keys = [self.model._meta.pk.to_python(key) for key in keys]
+        missing = {key for key in keys if key not in self._cache}
+        if missing:
+            found = self.model.objects.in_bulk(missing)
+            for key in missing:
+                self._cache[key] = found.get(key)
+        return [self._cache[key] for key in keys]
+
+    def prime(self, instance):
+        self._cache[instance.pk] = instance
+
+    def clear(self, key):
+        self._cache.pop(self.model._meta.pk.to_python(key), None)
+
+    def clear_all(self):
+        self._cache.clear()
+
+
+class CustomerLoader(ModelLoader):
+    model = Customer
+
+
+class ProductLoader(ModelLoader):
+    model = Product
+
+
+LOADER_CLASSES = {loader_class.model: loader_class for loader_class in (CustomerLoader, ProductLoader)}
+
+
+def request_cache(context, name):
+    """A dict stored on the request under `name`, created on first use.
+
+    Without a request object to hold it (e.g. schema.execute() without a context), a fresh,
+    unshared dict is returned so lookups still work.
+    """
+    cache = getattr(context, name, None)
+    if cache is None:
+        cache = {}
+        try:
+            setattr(context, name, cache)
+        except AttributeError:
+            pass
+    return cache
+
+
+def get_loader(context, model):
+    """The request's loader for a model (None if it has none), created on first use."""
+    loader_class = LOADER_CLASSES.get(model)
+    if loader_class is None:
+        return None
+    loaders = request_cache(context, "loaders")
+    if model not in loaders:
+        loaders[model] = loader_class()
+    return loaders[model]
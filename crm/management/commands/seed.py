@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from crm.models import Customer, Order, Product
+
+CUSTOMERS_DATA = [
+    {"name": "Alice", "email": "alice@example.com", "phone": "123456789"},
+    {"name": "Bob", "email": "bob@example.com", "phone": "987654321"},
+    {"name": "Carol", "email": "carol@example.com", "phone": "555555555"},
+]
+
+PRODUCTS_DATA = [
+    {"name": "Laptop", "price": 1000.00, "stock": 10},
+    {"name": "Phone", "price": 500.00, "stock": 20},
+    {"name": "Headphones", "price": 100.00, "stock": 50},
+]
+
+
+class Command(BaseCommand):
+    help = "Seed the database with sample customers, products and an order"
+
+    def handle(self, *args, **options):
+        self.stdout.write("🌱 Seeding database...")
+
+        # All inserts share one transaction (and one commit)
+        with transaction.atomic():
+            # Existing emails are skipped by the unique index (ON CONFLICT DO NOTHING)
+            Customer.objects.bulk_create([Customer(**data) for data in CUSTOMERS_DATA], ignore_conflicts=True)
+            by_email = Customer.objects.in_bulk([data["email"] for data in CUSTOMERS_DATA], field_name="email")
+            customers = {data["name"]: by_email[data["email"]] for data in CUSTOMERS_DATA}
+            self.stdout.write(f"✅ Customers ready: {', '.join(customers)}")
+
+            # Product names aren't unique in the schema, so existing ones are looked up first
+            product_names = [data["name"] for data in PRODUCTS_DATA]
+            existing = set(Product.objects.filter(name__in=product_names).values_list("name", flat=True))
+            Product.objects.bulk_create([Product(**data) for data in PRODUCTS_DATA if data["name"] not in existing])
+            products = {product.name: product for product in Product.objects.filter(name__in=product_names)}
+            self.stdout.write(f"✅ Products ready: {', '.join(products)}")
+
+            # --- Orders ---
+            try:
+                # Savepoint, so a failed order doesn't break the surrounding transaction
+                with transaction.atomic():
+                    self.seed_order(customers["Alice"], [products["Laptop"], products["Headphones"]])
+            except Exception as e:
+                self.stdout.write(f"❌ Failed to create order: {e}")
+
+        self.stdout.write("✨ Done seeding data!")
+
+    def seed_order(self, customer, order_products):
+        # The total comes from the prices already loaded, so no calculate_total() round-trips
+        quantity = 1
+        order, created = Order.objects.get_or_create(
+            customer=customer,
+            defaults={
+                "order_date": timezone.now(),
+                "quantity": quantity,
+                "total_amount": sum(product.price for product in order_products) * quantity,
+                "stock_reserved": True,
+            },
+        )
+        if not created:
+            self.stdout.write(f"⚠️ Order already exists for {customer.name}")
+            return
+
+        # Take the stock the same way CreateOrder does; the caller's savepoint rolls back on failure
+        if not Product.reserve(order_products, quantity):
+            raise CommandError(f"Insufficient stock for {', '.join(p.name for p in order_products)}")
+
+        # Link the products with one multi-row INSERT into the through table
+        Order.products.through.objects.bulk_create(
+            [Order.products.through(order=order, product=product) for product in order_products]
+        )
+        self.stdout.write(f"✅ Created order for {customer.name}")
+        self.stdout.write(f"   Products: {len(order_products)}")
+        self.stdout.write(f"   Total: ${order.total_amount}")
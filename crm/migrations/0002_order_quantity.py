@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-15 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='quantity',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
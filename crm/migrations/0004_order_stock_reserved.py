@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_filter_indexes'),
+    ]
+
+    operations = [
+        # Existing orders are marked as not having reserved stock: rows backfilled by 0002 and
+        # seeded orders never took any, and the ones created by CreateOrder can't be told apart.
+        # Deleting or changing a legacy order therefore leaves stock untouched rather than
+        # handing back units it may never have taken.
+        migrations.AddField(
+            model_name='order',
+            name='stock_reserved',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F, Sum
 from django.utils import timezone
 
 class Customer(models.Model):
@@ -14,6 +15,20 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        # Backs ProductFilter's price and stock range lookups
+        indexes = [models.Index(fields=["price"]), models.Index(fields=["stock"])]
+
+    @classmethod
+    def reserve(cls, products, quantity):
+        """Take `quantity` units of each product in a single conditional UPDATE.
+
+        Returns False if any product is short; call it inside a transaction and roll back then,
+        since the products that did have enough were already decremented.
+        """
+        pks = {product.pk for product in products}
+        return cls.objects.filter(pk__in=pks, stock__gte=quantity).update(stock=F("stock") - quantity) == len(pks)
+
     def __str__(self):
         return f"{self.name} - ${self.price}"
 
@@ -21,23 +36,36 @@ class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="orders")
     products = models.ManyToManyField(Product, related_name="orders")
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    quantity = models.PositiveIntegerField(default=1)
+    # Whether `quantity` units of each product were taken from stock for this order;
+    # only such orders give stock back when they're changed or deleted
+    stock_reserved = models.BooleanField(default=False)
     order_date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        # Backs OrderFilter's date range lookups, alone and per customer
+        indexes = [models.Index(fields=["order_date"]), models.Index(fields=["customer", "order_date"])]
+
     def save(self, *args, **kwargs):
         # First save the object to get an ID
         if not self.pk:  # Only on creation
             super().save(*args, **kwargs)
         else:
-            # Calculate total_amount only if object already exists and has products
-            if self.pk and self.products.exists():
-                self.total_amount = sum(product.price for product in self.products.all())
+            # Calculate total_amount only if object already exists and has products,
+            # skipping partial saves that don't write the total. Each product is
+            # ordered `quantity` times.
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "total_amount" in update_fields:
+                total = self.products.aggregate(total=Sum("price"))["total"]
+                if total is not None:
+                    self.total_amount = round(total * self.quantity, 2)
             super().save(*args, **kwargs)
 
     def calculate_total(self):
         """Method to calculate total after adding products"""
         if self.pk:  # Only if order has been saved
-            self.total_amount = sum(product.price for product in self.products.all())
-            self.save(update_fields=['total_amount'])
+            self.total_amount = round((self.products.aggregate(total=Sum("price"))["total"] or 0) * self.quantity, 2)
+            Order.objects.filter(pk=self.pk).update(total_amount=self.total_amount)
         return self.total_amount
 
     def __str__(self):
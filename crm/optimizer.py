@@ -0,0 +1,103 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FragmentSpreadNode, InlineFragmentNode
+
+# Connection arguments that page through prefetched rows without re-querying
+PAGINATION_ARGS = {"first", "last", "before", "after", "offset"}
+
+
+def selected_fields(selection_set, info):
+    """Yield the field nodes of a selection set, flattening fragments and relay edges/node."""
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpreadNode):
+            yield from selected_fields(info.fragments[selection.name.value].selection_set, info)
+        elif isinstance(selection, InlineFragmentNode):
+            yield from selected_fields(selection.selection_set, info)
+        elif selection.name.value in ("edges", "node"):
+            yield from selected_fields(selection.selection_set, info)
+        else:
+            yield selection
+
+
+def related_lookups(model, selection_set, info, prefix=""):
+    """Return the (only, select_related, prefetch) lookups needed by a selection set.
+
+    prefetch maps each many-valued path to (related model, columns it must load, selection sets).
+    """
+    only, select, prefetch = [prefix + model._meta.pk.name], [], {}
+    for field_node in selected_fields(selection_set, info):
+        try:
+            field = model._meta.get_field(to_snake_case(field_node.name.value))
+        except FieldDoesNotExist:
+            continue
+
+        path = prefix + field.name
+        if not field.is_relation:
+            if field.concrete:
+                only.append(path)
+            continue
+
+        if field.many_to_one or field.one_to_one:
+            nested_only, nested_select, nested_prefetch = related_lookups(
+                field.related_model, field_node.selection_set, info, path + "__"
+            )
+            # Joined rows are narrowed too; the FK column itself must stay loaded
+            only.append(path)
+            only.extend(nested_only)
+            select.append(path)
+            select.extend(nested_select)
+            merge_prefetch(prefetch, nested_prefetch)
+        elif not any(arg.name.value not in PAGINATION_ARGS for arg in field_node.arguments):
+            # Filtered connections re-query anyway, so only prefetch plain ones.
+            # Reverse FK rows are matched to their parent through the FK column.
+            required = [field.field.name] if field.one_to_many else []
+            merge_prefetch(prefetch, {path: (field.related_model, required, [field_node.selection_set])})
+    return only, select, prefetch
+
+
+def merge_prefetch(prefetch, other):
+    for path, (related_model, required, selection_sets) in other.items():
+        entry = prefetch.setdefault(path, (related_model, [], []))
+        entry[1].extend(required)
+        entry[2].extend(selection_sets)
+
+
+def apply_lookups(queryset, selection_sets, info, required=()):
+    """Narrow columns and attach the joins and prefetches the selection sets need."""
+    only, select, prefetch = list(required), [], {}
+    for selection_set in selection_sets:
+        set_only, set_select, set_prefetch = related_lookups(queryset.model, selection_set, info)
+        only.extend(set_only)
+        select.extend(set_select)
+        merge_prefetch(prefetch, set_prefetch)
+    queryset = queryset.only(*only)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        # Each prefetched relation gets its own optimized queryset, so its FKs are joined too
+        queryset = queryset.prefetch_related(
+            *(
+                Prefetch(path, queryset=apply_lookups(related_model.objects.all(), nested_sets, info, nested_required))
+                for path, (related_model, nested_required, nested_sets) in prefetch.items()
+            )
+        )
+    return queryset
+
+
+def optimize(queryset, info, required=()):
+    """Optimize a queryset for the fields selected under the field currently being resolved."""
+    return apply_lookups(queryset, [field_node.selection_set for field_node in info.field_nodes], info, required)
+
+
+def optimize_subfield(queryset, info, name):
+    """Optimize a queryset for the fields selected under one sub-field, such as a mutation payload's."""
+    selection_sets = [
+        field_node.selection_set
+        for parent in info.field_nodes
+        for field_node in selected_fields(parent.selection_set, info)
+        if field_node.name.value == name
+    ]
+    return apply_lookups(queryset, selection_sets, info)
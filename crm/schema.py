@@ -1,45 +1,114 @@
 import graphene
+from django.db import IntegrityError, transaction
+from django.db.models import F, Manager
+from graphene_django import bypass_get_queryset
 from graphene_django.types import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
+from graphql import GraphQLError, print_ast
 from .models import Customer, Product, Order
+from .fields import FilterConnectionField
 from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .loaders import get_loader, request_cache
+from .optimizer import optimize, optimize_subfield
 
 
 # ---------------- GraphQL Types ----------------
-class CustomerType(DjangoObjectType):
+class OptimizedObjectType(DjangoObjectType):
+    """Querysets are narrowed to the selected columns and load selected relations up front."""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        # Managers are the unresolved entry points (root lists, node lookups, nested
+        # connections); a manager already filled by a parent's prefetch is left as is
+        if isinstance(queryset, Manager) and queryset.get_queryset()._result_cache is None:
+            # Reverse FK managers read the FK column to link rows back to their parent
+            required = [queryset.field.name] if hasattr(queryset, "field") else []
+            return optimize(queryset.get_queryset(), info, required)
+        return queryset
+
+    @classmethod
+    def get_node(cls, info, id):
+        # Full rows the request's loader already holds serve any selection
+        loader = get_loader(info.context, cls._meta.model)
+        if loader is not None and id in loader:
+            node = loader.load(id)
+            if node is None or not node.get_deferred_fields():
+                return node
+        # A fetched node is narrowed with only() and prefetches for its own selection, so it is
+        # only reused for repeated lookups of the same id with the same selection
+        key = (cls, str(id), tuple(print_ast(field_node.selection_set) for field_node in info.field_nodes))
+        nodes = request_cache(info.context, "nodes")
+        if key not in nodes:
+            nodes[key] = super().get_node(info, id)
+        return nodes[key]
+
+
+class CustomerType(OptimizedObjectType):
     class Meta:
         model = Customer
         filterset_class = CustomerFilter
         interfaces = (graphene.relay.Node,)
 
 
-class ProductType(DjangoObjectType):
+class ProductType(OptimizedObjectType):
     class Meta:
         model = Product
         filterset_class = ProductFilter
         interfaces = (graphene.relay.Node,)
 
 
-class OrderType(DjangoObjectType):
+class OrderType(OptimizedObjectType):
     class Meta:
         model = Order
+        exclude = ("stock_reserved",)
         filterset_class = OrderFilter
         interfaces = (graphene.relay.Node,)
 
+    @bypass_get_queryset
+    def resolve_customer(root, info):
+        # Read the JOINed customer instead of a get_node lookup per order; orders that
+        # weren't loaded through the optimizer (mutation payloads) go through the loader,
+        # which costs one query per distinct customer and none for a repeated one
+        if Order.customer.is_cached(root):
+            return root.customer
+        return get_loader(info.context, Customer).load(root.customer_id)
+
 
 # ---------------- Queries ----------------
 class Query(graphene.ObjectType):
     customer = graphene.relay.Node.Field(CustomerType)
-    all_customers = DjangoFilterConnectionField(CustomerType)
+    all_customers = FilterConnectionField(CustomerType)
 
     product = graphene.relay.Node.Field(ProductType)
-    all_products = DjangoFilterConnectionField(ProductType)
+    all_products = FilterConnectionField(ProductType)
 
     order = graphene.relay.Node.Field(OrderType)
-    all_orders = DjangoFilterConnectionField(OrderType)
+    all_orders = FilterConnectionField(OrderType)
 
 
 # ---------------- Mutations ----------------
+def _get_or_error(queryset, pk):
+    """Fetch a row by primary key, raising a GraphQLError that names the model if it's missing."""
+    try:
+        return queryset.get(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise GraphQLError(f"{queryset.model.__name__} not found")
+
+
+def _loaded_or_error(instance, model):
+    """Raise the same error as _get_or_error for a loader miss."""
+    if instance is None:
+        raise GraphQLError(f"{model.__name__} not found")
+    return instance
+
+
+def _check_quantity(quantity):
+    if quantity < 1:
+        raise GraphQLError("Quantity must be at least 1")
+
+
 class CreateCustomer(graphene.Mutation):
     class Arguments:
         name = graphene.String(required=True)
@@ -49,7 +118,12 @@ class CreateCustomer(graphene.Mutation):
     customer = graphene.Field(CustomerType)
 
     def mutate(self, info, name, email, phone):
-        customer = Customer.objects.create(name=name, email=email, phone=phone)
+        # The unique index on email decides collisions; no SELECT beforehand
+        try:
+            with transaction.atomic():
+                customer = Customer.objects.create(name=name, email=email, phone=phone)
+        except IntegrityError:
+            raise GraphQLError("Email already exists")
         return CreateCustomer(customer=customer)
 
 
@@ -63,14 +137,27 @@ class UpdateCustomer(graphene.Mutation):
     customer = graphene.Field(CustomerType)
 
     def mutate(self, info, id, name=None, email=None, phone=None):
-        customer = Customer.objects.get(pk=id)
+        # Only the columns that were given are written, with a single UPDATE
+        fields = {}
         if name:
-            customer.name = name
+            fields["name"] = name
         if email:
-            customer.email = email
+            fields["email"] = email
         if phone:
-            customer.phone = phone
-        customer.save()
+            fields["phone"] = phone
+        customers = Customer.objects.filter(pk=id)
+        if fields:
+            try:
+                with transaction.atomic():
+                    updated = customers.update(**fields)
+            except IntegrityError:
+                raise GraphQLError("Email already exists")
+            if not updated:
+                raise GraphQLError("Customer not found")
+            # Later lookups in the same document must see the new values
+            get_loader(info.context, Customer).clear(id)
+        # Read back only what the payload selects
+        customer = _get_or_error(optimize_subfield(customers, info, "customer"), id)
         return UpdateCustomer(customer=customer)
 
 
@@ -81,15 +168,18 @@ class DeleteCustomer(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, id):
-        customer = Customer.objects.get(pk=id)
-        customer.delete()
+        # Deleted straight from the queryset, without loading the instance first
+        deleted, _ = Customer.objects.filter(pk=id).delete()
+        if not deleted:
+            raise GraphQLError("Customer not found")
+        get_loader(info.context, Customer).clear(id)
         return DeleteCustomer(success=True)
 
 
 class CreateProduct(graphene.Mutation):
     class Arguments:
         name = graphene.String(required=True)
-        price = graphene.Float(required=True)
+        price = graphene.Decimal(required=True)
 
     product = graphene.Field(ProductType)
 
@@ -102,17 +192,25 @@ class UpdateProduct(graphene.Mutation):
     class Arguments:
         id = graphene.ID(required=True)
         name = graphene.String()
-        price = graphene.Float()
+        price = graphene.Decimal()
 
     product = graphene.Field(ProductType)
 
     def mutate(self, info, id, name=None, price=None):
-        product = Product.objects.get(pk=id)
+        # Only the columns that were given are written, with a single UPDATE
+        fields = {}
         if name:
-            product.name = name
+            fields["name"] = name
         if price is not None:
-            product.price = price
-        product.save()
+            fields["price"] = price
+        products = Product.objects.filter(pk=id)
+        if fields:
+            if not products.update(**fields):
+                raise GraphQLError("Product not found")
+            # Later lookups in the same document must see the new values
+            get_loader(info.context, Product).clear(id)
+        # Read back only what the payload selects
+        product = _get_or_error(optimize_subfield(products, info, "product"), id)
         return UpdateProduct(product=product)
 
 
@@ -123,24 +221,55 @@ class DeleteProduct(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, id):
-        product = Product.objects.get(pk=id)
-        product.delete()
+        # Deleted straight from the queryset, without loading the instance first
+        deleted, _ = Product.objects.filter(pk=id).delete()
+        if not deleted:
+            raise GraphQLError("Product not found")
+        get_loader(info.context, Product).clear(id)
         return DeleteProduct(success=True)
 
 
 class CreateOrder(graphene.Mutation):
     class Arguments:
         customer_id = graphene.ID(required=True)
-        product_id = graphene.ID(required=True)
+        product_id = graphene.ID()  # kept for single-product clients
+        product_ids = graphene.List(graphene.NonNull(graphene.ID))
         quantity = graphene.Int(required=True)
 
     order = graphene.Field(OrderType)
 
-    def mutate(self, info, customer_id, product_id, quantity):
-        customer = Customer.objects.get(pk=customer_id)
-        product = Product.objects.get(pk=product_id)
-        order = Order.objects.create(customer=customer, quantity=quantity)
-        order.products.add(product)  # ✅ ManyToMany handled properly
+    def mutate(self, info, customer_id, quantity, product_id=None, product_ids=None):
+        _check_quantity(quantity)
+        ids = list(product_ids or [])
+        if product_id is not None:
+            ids.insert(0, product_id)
+        if not ids:
+            raise GraphQLError("Provide productId or productIds")
+
+        customer = _loaded_or_error(get_loader(info.context, Customer).load(customer_id), Customer)
+        # One in_bulk query for every product
+        product_loader = get_loader(info.context, Product)
+        loaded = product_loader.load_many(ids)
+        if None in loaded:
+            raise GraphQLError("Product not found")
+        products = list({product.pk: product for product in loaded}.values())
+
+        with transaction.atomic():
+            # Check and reserve stock in a single UPDATE that can't race other orders
+            if not Product.reserve(products, quantity):
+                short = [p.name for p in products if p.stock < quantity] or [p.name for p in products]
+                raise GraphQLError(f"Insufficient stock for {', '.join(short)}")
+            # Total comes from the already loaded prices, so no re-save is needed
+            order = Order.objects.create(
+                customer=customer,
+                quantity=quantity,
+                total_amount=sum(p.price for p in products) * quantity,
+                stock_reserved=True,
+            )
+            order.products.add(*products)  # ✅ one multi-row INSERT into the through table
+        # The loaded products' stock is stale now
+        for product in products:
+            product_loader.clear(product.pk)
         return CreateOrder(order=order)
 
 
@@ -152,10 +281,26 @@ class UpdateOrder(graphene.Mutation):
     order = graphene.Field(OrderType)
 
     def mutate(self, info, id, quantity=None):
-        order = Order.objects.get(pk=id)
         if quantity is not None:
-            order.quantity = quantity
-        order.save()
+            _check_quantity(quantity)
+        with transaction.atomic():
+            # Lock the order so concurrent updates compute their stock delta from the same quantity
+            order = _get_or_error(Order.objects.select_for_update(), id)
+            if quantity is not None and quantity != order.quantity:
+                # Orders that never took stock (legacy rows) don't move it either
+                if order.stock_reserved:
+                    delta = quantity - order.quantity
+                    try:
+                        with transaction.atomic():
+                            # Move the reserved stock difference with one UPDATE across the order's
+                            # products; the stock >= 0 check constraint rejects any shortfall
+                            Product.objects.filter(orders=order).update(stock=F("stock") - delta)
+                    except IntegrityError:
+                        raise GraphQLError(f"Insufficient stock to raise quantity to {quantity}")
+                # The product set is unchanged; the total is recomputed for the new quantity
+                order.quantity = quantity
+                order.save(update_fields=["quantity", "total_amount"])
+                get_loader(info.context, Product).clear_all()
         return UpdateOrder(order=order)
 
 
@@ -166,8 +311,12 @@ class DeleteOrder(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, id):
-        order = Order.objects.get(pk=id)
-        order.delete()
+        with transaction.atomic():
+            # Lock the order so a concurrent delete or update can't restore or move its stock twice;
+            # the reserved stock itself is handed back by the Order pre_delete receiver
+            order = _get_or_error(Order.objects.select_for_update(), id)
+            order.delete()
+        get_loader(info.context, Product).clear_all()
         return DeleteOrder(success=True)
 
 
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .cache import invalidate_responses, response_cache_timeout
+from .models import Customer, Order, Product
+
+
+def invalidate_on_commit(sender, **kwargs):
+    # Model save()/delete() calls in this process (e.g. the admin) drop cached responses too.
+    # queryset.update() sends no signal, and other processes only reach the same cache when
+    # CACHES is shared, which is why response caching is opt-in.
+    # (no m2m_changed receiver: it would cost products.add() its fast path, and admin
+    # order edits already send post_save for the order)
+    if response_cache_timeout():
+        transaction.on_commit(invalidate_responses)
+
+
+for model in (Customer, Product, Order):
+    post_save.connect(invalidate_on_commit, sender=model, dispatch_uid=f"graphql-response-{model.__name__}-save")
+    post_delete.connect(invalidate_on_commit, sender=model, dispatch_uid=f"graphql-response-{model.__name__}-delete")
+
+
+def release_stock(sender, instance, **kwargs):
+    # Runs for every deleted order, including those cascaded from a deleted customer, while
+    # its product links still exist; one UPDATE hands the reserved units back
+    if instance.stock_reserved:
+        Product.objects.filter(orders=instance).update(stock=F("stock") + instance.quantity)
+
+
+pre_delete.connect(release_stock, sender=Order, dispatch_uid="order-release-stock")
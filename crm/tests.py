@@ -1,3 +1,608 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .filters import CustomerFilter, ProductFilter
+from .loaders import CustomerLoader, get_loader
+from .models import Customer, Order, Product
+from .schema import schema
+from .views import introspect, parse_document, validate_document
+
+
+class GraphQLTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def post(self, payload):
+        response = self.client.post("/graphql/", json.dumps(payload), content_type="application/json")
+        return response.json()
+
+    def query(self, query, variables=None):
+        return self.post({"query": query, "variables": variables or {}})
+
+
+class KeysetPaginationTests(GraphQLTestCase):
+    QUERY = """
+        query($first: Int, $last: Int, $after: String, $before: String) {
+          allProducts(first: $first, last: $last, after: $after, before: $before) {
+            pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+            edges { cursor node { name } }
+          }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Product.objects.create(name=f"P{i}", price="1.00")
+
+    def page(self, **variables):
+        connection = self.query(self.QUERY, variables)["data"]["allProducts"]
+        return [edge["node"]["name"] for edge in connection["edges"]], connection
+
+    def test_forward_pages_follow_the_end_cursor(self):
+        names, connection = self.page(first=2)
+        self.assertEqual(names, ["P0", "P1"])
+        self.assertTrue(connection["pageInfo"]["hasNextPage"])
+        self.assertFalse(connection["pageInfo"]["hasPreviousPage"])
+
+        names, connection = self.page(first=2, after=connection["pageInfo"]["endCursor"])
+        self.assertEqual(names, ["P2", "P3"])
+        self.assertTrue(connection["pageInfo"]["hasPreviousPage"])
+
+        names, connection = self.page(first=2, after=connection["pageInfo"]["endCursor"])
+        self.assertEqual(names, ["P4"])
+        self.assertFalse(connection["pageInfo"]["hasNextPage"])
+
+    def test_cursors_are_keyset_cursors(self):
+        _, connection = self.page(first=1)
+        pk = Product.objects.get(name="P0").pk
+        self.assertEqual(base64.b64decode(connection["edges"][0]["cursor"]).decode(), f"keyset:{pk}")
+
+    def test_first_zero_returns_no_rows(self):
+        names, _ = self.page(first=0)
+        self.assertEqual(names, [])
+
+    def test_backward_pages_follow_the_start_cursor(self):
+        names, connection = self.page(last=2)
+        self.assertEqual(names, ["P3", "P4"])
+        self.assertTrue(connection["pageInfo"]["hasPreviousPage"])
+
+        names, connection = self.page(last=2, before=connection["pageInfo"]["startCursor"])
+        self.assertEqual(names, ["P1", "P2"])
+        self.assertTrue(connection["pageInfo"]["hasNextPage"])
+        self.assertTrue(connection["pageInfo"]["hasPreviousPage"])
+
+        names, connection = self.page(last=2, before=connection["pageInfo"]["startCursor"])
+        self.assertEqual(names, ["P0"])
+        self.assertFalse(connection["pageInfo"]["hasPreviousPage"])
+
+    def test_after_and_before_bound_the_page(self):
+        _, connection = self.page(first=5)
+        cursors = [edge["cursor"] for edge in connection["edges"]]
+        names, _ = self.page(first=10, after=cursors[0], before=cursors[4])
+        self.assertEqual(names, ["P1", "P2", "P3"])
+
+    def test_offset_cursors_still_work(self):
+        offset_cursor = base64.b64encode(b"arrayconnection:1").decode()
+        names, _ = self.page(first=2, after=offset_cursor)
+        self.assertEqual(names, ["P2", "P3"])
+
+    def test_negative_first_is_rejected(self):
+        result = self.query(self.QUERY, {"first": -1})
+        self.assertIn("non-negative", result["errors"][0]["message"])
+
+
+class OptimizerTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        alice = Customer.objects.create(name="Alice", email="alice@example.com")
+        bob = Customer.objects.create(name="Bob", email="bob@example.com")
+        laptop = Product.objects.create(name="Laptop", price="1000.00", stock=10)
+        phone = Product.objects.create(name="Phone", price="500.00", stock=5)
+        for customer in (alice, alice, bob):
+            order = Order.objects.create(customer=customer, total_amount="1500.00")
+            order.products.add(laptop, phone)
+
+    def test_orders_join_customer_and_prefetch_products(self):
+        with self.assertNumQueries(2):
+            result = self.query(
+                "{ allOrders { edges { node { totalAmount customer { name } products { edges { node { name } } } } } } }"
+            )
+        orders = [edge["node"] for edge in result["data"]["allOrders"]["edges"]]
+        self.assertEqual([order["customer"]["name"] for order in orders], ["Alice", "Alice", "Bob"])
+        self.assertEqual([len(order["products"]["edges"]) for order in orders], [2, 2, 2])
+
+    def test_customers_orders_and_products_take_one_query_per_level(self):
+        with self.assertNumQueries(3):
+            result = self.query(
+                "{ allCustomers { edges { node { name orders { edges { node { totalAmount "
+                "products { edges { node { name } } } } } } } } } }"
+            )
+        customers = result["data"]["allCustomers"]["edges"]
+        self.assertEqual([len(edge["node"]["orders"]["edges"]) for edge in customers], [2, 1])
+
+    def test_fragments_are_followed(self):
+        with self.assertNumQueries(2):
+            self.query(
+                "{ allCustomers { edges { node { ...CustomerOrders } } } } "
+                "fragment CustomerOrders on CustomerType { name orders { edges { node { id } } } }"
+            )
+
+    def test_only_selected_columns_are_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.query("{ allOrders { edges { node { totalAmount customer { name } } } } }")
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"]
+        for column in ('"crm_order"."total_amount"', '"crm_order"."customer_id"', '"crm_customer"."name"'):
+            self.assertIn(column, sql)
+        for column in ('"crm_order"."order_date"', '"crm_customer"."email"', '"crm_customer"."phone"'):
+            self.assertNotIn(column, sql)
+
+    def test_prefetched_rows_join_their_own_relations(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.query(
+                "{ allProducts { edges { node { name orders { edges { node { totalAmount customer { email } } } } } } } }"
+            )
+        self.assertEqual(len(queries), 2)
+        # The prefetched orders are narrowed and JOIN their customer instead of prefetching it
+        prefetch_sql = queries[1]["sql"]
+        self.assertIn('"crm_customer"."email"', prefetch_sql)
+        self.assertNotIn('"crm_customer"."name"', prefetch_sql)
+        self.assertNotIn('"crm_order"."order_date"', prefetch_sql)
+        emails = [
+            edge["node"]["customer"]["email"]
+            for product in result["data"]["allProducts"]["edges"]
+            for edge in product["node"]["orders"]["edges"]
+        ]
+        self.assertEqual(emails, ["alice@example.com", "alice@example.com", "bob@example.com"] * 2)
+
+    def test_node_lookups_are_optimized(self):
+        order_id = base64.b64encode(f"OrderType:{Order.objects.first().pk}".encode()).decode()
+        with self.assertNumQueries(2):
+            result = self.query(
+                "query($id: ID!) { order(id: $id) { totalAmount customer { name } products { edges { node { name } } } } }",
+                {"id": order_id},
+            )
+        self.assertEqual(result["data"]["order"]["customer"]["name"], "Alice")
+
+    def test_filtered_nested_connections_are_optimized_per_parent(self):
+        # Filtered connections can't use a prefetch: each customer runs a count and a page
+        # query, but the page JOINs the customer instead of loading it per order
+        with self.assertNumQueries(1 + 2 * 2):
+            result = self.query(
+                "{ allCustomers { edges { node { name orders(totalAmount_Gte: 1) { edges { node { "
+                "totalAmount customer { name } } } } } } } }"
+            )
+        customers = result["data"]["allCustomers"]["edges"]
+        self.assertEqual([len(edge["node"]["orders"]["edges"]) for edge in customers], [2, 1])
+
+
+class LoaderTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name="Alice", email="alice@example.com")
+
+    def test_get_loader_is_shared_per_context(self):
+        class Context:
+            pass
+
+        context = Context()
+        self.assertIs(get_loader(context, Customer), get_loader(context, Customer))
+        self.assertIsInstance(get_loader(context, Customer), CustomerLoader)
+        self.assertIsNone(get_loader(context, Order))
+
+    def test_get_loader_without_context(self):
+        loader = get_loader(None, Customer)
+        self.assertEqual(loader.load(self.customer.pk), self.customer)
+
+    def test_load_many_fetches_missing_keys_once(self):
+        other = Customer.objects.create(name="Bob", email="bob@example.com")
+        loader = CustomerLoader()
+        with self.assertNumQueries(1):
+            self.assertEqual(loader.load_many([self.customer.pk, other.pk, 0]), [self.customer, other, None])
+        with self.assertNumQueries(0):
+            self.assertEqual(loader.load(str(other.pk)), other)
+
+    def test_loaded_rows_see_earlier_writes_in_the_same_document(self):
+        product = Product.objects.create(name="Pen", price="2.00", stock=3)
+        result = self.query(
+            """
+            mutation($customer: ID!, $product: ID!) {
+              first: createOrder(customerId: $customer, productIds: [$product], quantity: 1) {
+                order { customer { name } }
+              }
+              updateCustomer(id: $customer, name: "Alicia") { customer { name } }
+              updateProduct(id: $product, price: "5.00") { product { price } }
+              second: createOrder(customerId: $customer, productIds: [$product], quantity: 1) {
+                order { totalAmount customer { name } }
+              }
+            }
+            """,
+            {"customer": self.customer.pk, "product": product.pk},
+        )
+        self.assertEqual(result["data"]["first"]["order"]["customer"]["name"], "Alice")
+        self.assertEqual(result["data"]["second"]["order"]["customer"]["name"], "Alicia")
+        self.assertEqual(result["data"]["second"]["order"]["totalAmount"], "5.00")
+
+    def test_create_order_without_a_request_context(self):
+        product = Product.objects.create(name="Pen", price="2.00", stock=3)
+        result = schema.execute(
+            """
+            mutation($customer: ID!, $product: ID!) {
+              createOrder(customerId: $customer, productIds: [$product], quantity: 1) {
+                order { totalAmount customer { name } }
+              }
+            }
+            """,
+            variable_values={"customer": self.customer.pk, "product": product.pk},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["createOrder"]["order"]["customer"]["name"], "Alice")
+
+    def test_payload_customers_are_loaded_once_per_customer(self):
+        product = Product.objects.create(name="Pen", price="2.00", stock=10)
+        orders = [Order.objects.create(customer=self.customer) for _ in range(2)]
+        for order in orders:
+            order.products.add(product)
+        with CaptureQueriesContext(connection) as queries:
+            result = self.query(
+                """
+                mutation($a: ID!, $b: ID!) {
+                  a: updateOrder(id: $a, quantity: 2) { order { customer { name } } }
+                  b: updateOrder(id: $b, quantity: 2) { order { customer { name } } }
+                }
+                """,
+                {"a": orders[0].pk, "b": orders[1].pk},
+            )
+        self.assertEqual(result["data"]["b"]["order"]["customer"]["name"], "Alice")
+        customer_queries = [query for query in queries if query["sql"].startswith('SELECT "crm_customer"')]
+        self.assertEqual(len(customer_queries), 1)
+
+
+class StockReservationTests(GraphQLTestCase):
+    CREATE = """
+        mutation($customer: ID!, $products: [ID!], $quantity: Int!) {
+          createOrder(customerId: $customer, productIds: $products, quantity: $quantity) {
+            order { id totalAmount quantity }
+          }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name="Alice", email="alice@example.com")
+        self.laptop = Product.objects.create(name="Laptop", price="1000.00", stock=10)
+        self.phone = Product.objects.create(name="Phone", price="500.00", stock=5)
+
+    def create_order(self, quantity, products=None):
+        products = products or [self.laptop, self.phone]
+        return self.query(
+            self.CREATE,
+            {"customer": self.customer.pk, "products": [p.pk for p in products], "quantity": quantity},
+        )
+
+    def stock(self):
+        self.laptop.refresh_from_db()
+        self.phone.refresh_from_db()
+        return self.laptop.stock, self.phone.stock
+
+    def test_create_order_reserves_and_prices_by_quantity(self):
+        result = self.create_order(3)
+        self.assertEqual(result["data"]["createOrder"]["order"]["totalAmount"], "4500.00")
+        self.assertEqual(self.stock(), (7, 2))
+        self.assertTrue(Order.objects.get().stock_reserved)
+
+    def test_quantity_below_one_is_rejected(self):
+        for quantity in (0, -2):
+            result = self.create_order(quantity)
+            self.assertEqual(result["errors"][0]["message"], "Quantity must be at least 1")
+        self.assertEqual(self.stock(), (10, 5))
+        self.assertFalse(Order.objects.exists())
+
+    def test_insufficient_stock_reserves_nothing(self):
+        result = self.create_order(6)
+        self.assertEqual(result["errors"][0]["message"], "Insufficient stock for Phone")
+        self.assertEqual(self.stock(), (10, 5))
+        self.assertFalse(Order.objects.exists())
+
+    def test_calculate_total_counts_quantity(self):
+        order = Order.objects.create(customer=self.customer, quantity=2)
+        order.products.add(self.laptop, self.phone)
+        order.calculate_total()
+        order.refresh_from_db()
+        self.assertEqual(str(order.total_amount), "3000.00")
+
+    def test_update_order_moves_the_stock_difference(self):
+        self.create_order(2)
+        order = Order.objects.get()
+        update = "mutation($id: ID!, $quantity: Int) { updateOrder(id: $id, quantity: $quantity) { order { totalAmount } } }"
+
+        result = self.query(update, {"id": order.pk, "quantity": 4})
+        self.assertEqual(result["data"]["updateOrder"]["order"]["totalAmount"], "6000.00")
+        self.assertEqual(self.stock(), (6, 1))
+
+        result = self.query(update, {"id": order.pk, "quantity": 1})
+        self.assertEqual(result["data"]["updateOrder"]["order"]["totalAmount"], "1500.00")
+        self.assertEqual(self.stock(), (9, 4))
+
+        result = self.query(update, {"id": order.pk, "quantity": 9})
+        self.assertEqual(result["errors"][0]["message"], "Insufficient stock to raise quantity to 9")
+        self.assertEqual(self.stock(), (9, 4))
+
+        result = self.query(update, {"id": order.pk, "quantity": 0})
+        self.assertEqual(result["errors"][0]["message"], "Quantity must be at least 1")
+
+    def test_delete_order_restores_stock(self):
+        self.create_order(2)
+        result = self.query("mutation($id: ID!) { deleteOrder(id: $id) { success } }", {"id": Order.objects.get().pk})
+        self.assertTrue(result["data"]["deleteOrder"]["success"])
+        self.assertEqual(self.stock(), (10, 5))
+
+    def test_deleting_a_customer_restores_stock_of_cascaded_orders(self):
+        self.create_order(2)
+        self.create_order(1, [self.laptop])
+        self.query("mutation($id: ID!) { deleteCustomer(id: $id) { success } }", {"id": self.customer.pk})
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stock(), (10, 5))
+
+    def test_legacy_orders_leave_stock_untouched(self):
+        order = Order.objects.create(customer=self.customer, quantity=2)
+        order.products.add(self.laptop)
+        self.query(
+            "mutation($id: ID!) { updateOrder(id: $id, quantity: 3) { order { quantity } } }", {"id": order.pk}
+        )
+        self.assertEqual(self.stock(), (10, 5))
+        order.delete()
+        self.assertEqual(self.stock(), (10, 5))
+
+    def test_reserve_reports_a_shortfall(self):
+        with transaction.atomic():
+            self.assertFalse(Product.reserve([self.laptop, self.phone], 6))
+            transaction.set_rollback(True)
+        self.assertEqual(self.stock(), (10, 5))
+        self.assertTrue(Product.reserve([self.laptop, self.phone], 5))
+        self.assertEqual(self.stock(), (5, 0))
+
+
+class FilterConnectionFieldTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        Customer.objects.create(name="Alice", email="alice@example.com")
+        Customer.objects.create(name="Bob", email="bob@example.com")
+
+    def names(self, query):
+        return [edge["node"]["name"] for edge in self.query(query)["data"]["allCustomers"]["edges"]]
+
+    def test_unfiltered_queries_skip_the_filterset(self):
+        with mock.patch.object(CustomerFilter, "__init__", autospec=True, side_effect=CustomerFilter.__init__) as init:
+            self.assertEqual(self.names("{ allCustomers { edges { node { name } } } }"), ["Alice", "Bob"])
+            init.assert_not_called()
+
+            self.assertEqual(self.names('{ allCustomers(name: "bo") { edges { node { name } } } }'), ["Bob"])
+            init.assert_called_once()
+
+
+class NodeLookupTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        customer = Customer.objects.create(name="Alice", email="alice@example.com")
+        self.product = Product.objects.create(name="Laptop", price="1000.00", stock=10)
+        for _ in range(3):
+            Order.objects.create(customer=customer, total_amount="1000.00").products.add(self.product)
+        self.node_id = base64.b64encode(f"ProductType:{self.product.pk}".encode()).decode()
+
+    def test_repeated_lookup_with_the_same_selection_is_reused(self):
+        with self.assertNumQueries(1):
+            result = self.query(
+                "query($id: ID!) { a: product(id: $id) { name } b: product(id: $id) { name } }", {"id": self.node_id}
+            )
+        self.assertEqual(result["data"]["a"], result["data"]["b"])
+
+    def test_lookups_with_different_selections_are_optimized_separately(self):
+        with self.assertNumQueries(4):
+            result = self.query(
+                """
+                query($id: ID!) {
+                  a: product(id: $id) { name orders { edges { node { id } } } }
+                  b: product(id: $id) { price orders { edges { node { totalAmount customer { email } } } } }
+                }
+                """,
+                {"id": self.node_id},
+            )
+        orders = result["data"]["b"]["orders"]["edges"]
+        self.assertEqual([edge["node"]["customer"]["email"] for edge in orders], ["alice@example.com"] * 3)
+
+    def test_full_rows_from_the_loader_serve_any_selection(self):
+        class Context:
+            pass
+
+        context = Context()
+        get_loader(context, Product).load(self.product.pk)
+        with self.assertNumQueries(0):
+            result = schema.execute(
+                "query($id: ID!) { product(id: $id) { name price stock } }",
+                variable_values={"id": self.node_id},
+                context_value=context,
+            )
+        self.assertEqual(result.data["product"], {"name": "Laptop", "price": "1000.00", "stock": 10})
+
+
+class CustomerEmailTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Customer.objects.create(name="Alice", email="alice@example.com")
+        self.bob = Customer.objects.create(name="Bob", email="bob@example.com")
+
+    def test_create_with_a_taken_email_is_reported(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.query(
+                'mutation { createCustomer(name: "Al", email: "alice@example.com", phone: "1") { customer { id } } }'
+            )
+        self.assertEqual(result["errors"][0]["message"], "Email already exists")
+        # The unique index decides; there is no SELECT before the INSERT
+        self.assertFalse([query for query in queries if query["sql"].startswith("SELECT")])
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_update_to_a_taken_email_is_reported(self):
+        result = self.query(
+            'mutation($id: ID!) { updateCustomer(id: $id, email: "bob@example.com") { customer { email } } }',
+            {"id": self.alice.pk},
+        )
+        self.assertEqual(result["errors"][0]["message"], "Email already exists")
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.email, "alice@example.com")
+
+
+class PersistedQueryTests(GraphQLTestCase):
+    QUERY = "{ allCustomers { edges { node { name } } } }"
+
+    def persisted(self, sha256, query=None):
+        payload = {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": sha256}}}
+        if query is not None:
+            payload["query"] = query
+        return self.post(payload)
+
+    def test_unknown_hash_asks_for_the_query(self):
+        result = self.persisted("0" * 64)
+        self.assertEqual(result["errors"][0]["message"], "PersistedQueryNotFound")
+        self.assertEqual(result["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_registered_query_runs_by_hash(self):
+        Customer.objects.create(name="Alice", email="alice@example.com")
+        sha256 = hashlib.sha256(self.QUERY.encode()).hexdigest()
+        self.assertNotIn("errors", self.persisted(sha256, self.QUERY))
+
+        result = self.persisted(sha256)
+        self.assertEqual(result["data"]["allCustomers"]["edges"][0]["node"]["name"], "Alice")
+
+    def test_mismatched_hash_is_rejected(self):
+        result = self.persisted("0" * 64, self.QUERY)
+        self.assertEqual(result["errors"][0]["message"], "provided sha does not match query")
+        self.assertIn("PersistedQueryNotFound", self.persisted("0" * 64)["errors"][0]["message"])
+
+    def test_repeated_documents_are_parsed_and_validated_once(self):
+        query = "{ allCustomers { edges { node { email } } } }"
+        self.query(query)
+        parsed, validated = parse_document.cache_info().hits, validate_document.cache_info().hits
+        self.query(query)
+        self.assertGreater(parse_document.cache_info().hits, parsed)
+        self.assertEqual(validate_document.cache_info().hits, validated + 1)
+
+
+class IntrospectionCacheTests(GraphQLTestCase):
+    def test_repeated_introspection_is_served_from_cache(self):
+        query = "{ __schema { queryType { name } } }"
+        first = self.query(query)
+        hits = introspect.cache_info().hits
+        with self.assertNumQueries(0):
+            second = self.query(query)
+        self.assertEqual(first, second)
+        self.assertEqual(first["data"]["__schema"]["queryType"]["name"], "Query")
+        self.assertEqual(introspect.cache_info().hits, hits + 1)
+
+
+class SeedCommandTests(TestCase):
+    def seed(self):
+        call_command("seed", stdout=StringIO())
+
+    def test_seeded_order_reserves_stock(self):
+        self.seed()
+        order = Order.objects.get()
+        self.assertTrue(order.stock_reserved)
+        self.assertEqual(str(order.total_amount), "1100.00")
+        stock = dict(Product.objects.values_list("name", "stock"))
+        self.assertEqual(stock, {"Laptop": 9, "Phone": 20, "Headphones": 49})
+
+        order.delete()
+        stock = dict(Product.objects.values_list("name", "stock"))
+        self.assertEqual(stock, {"Laptop": 10, "Phone": 20, "Headphones": 50})
+
+    def test_seeding_twice_reserves_once(self):
+        self.seed()
+        self.seed()
+        self.assertEqual(Customer.objects.count(), 3)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get(name="Laptop").stock, 9)
+
+
+class ResponseCacheTests(GraphQLTestCase):
+    QUERY = "{ allCustomers { edges { node { name } } } }"
+
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name="Alice", email="alice@example.com")
+
+    def names(self):
+        return [edge["node"]["name"] for edge in self.query(self.QUERY)["data"]["allCustomers"]["edges"]]
+
+    def test_responses_are_not_cached_by_default(self):
+        self.names()
+        Customer.objects.filter(pk=self.customer.pk).update(name="Alicia")
+        self.assertEqual(self.names(), ["Alicia"])
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_cached_response_is_served_until_a_mutation_commits(self):
+        self.names()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(), ["Alice"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.query('mutation($id: ID!) { updateCustomer(id: $id, name: "Alicia") { customer { name } } }',
+                       {"id": self.customer.pk})
+        self.assertEqual(self.names(), ["Alicia"])
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_TIMEOUT=60)
+    def test_model_saves_invalidate_cached_responses(self):
+        self.names()
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(name="Bob", email="bob@example.com")
+        self.assertEqual(self.names(), ["Alice", "Bob"])
+
+
+class ShapeCachedFilterSetTests(TestCase):
+    def setUp(self):
+        Customer.objects.create(name="Alice", email="alice@example.com", phone="+1555")
+        Customer.objects.create(name="Alan", email="alan@example.org", phone="+4420")
+        Customer.objects.create(name="Bob", email="bob@example.com")
+
+    def names(self, filterset):
+        return sorted(customer.name for customer in filterset.qs)
+
+    def test_only_given_filters_are_set_up(self):
+        filterset = CustomerFilter({"name": "al"})
+        self.assertEqual(list(filterset.filters), ["name"])
+        self.assertEqual(self.names(filterset), ["Alan", "Alice"])
+
+    def test_filters_combine(self):
+        self.assertEqual(self.names(CustomerFilter({"name": "al", "email": ".com"})), ["Alice"])
+
+    def test_method_filter(self):
+        self.assertEqual(self.names(CustomerFilter({"phone_pattern": "+1"})), ["Alice"])
+
+    def test_no_data_returns_everything(self):
+        filterset = CustomerFilter()
+        self.assertFalse(filterset.is_bound)
+        self.assertEqual(self.names(filterset), ["Alan", "Alice", "Bob"])
+
+    def test_invalid_value_is_reported(self):
+        filterset = ProductFilter({"price__gte": "cheap"})
+        self.assertFalse(filterset.is_valid())
+        self.assertIn("price__gte", filterset.errors)
+
+    def test_form_class_is_built_once_per_shape(self):
+        form_class = CustomerFilter({"name": "a", "email": "b"}).get_form_class()
+        self.assertIs(CustomerFilter({"email": "c", "name": "d"}).get_form_class(), form_class)
+        self.assertIsNot(CustomerFilter({"name": "a"}).get_form_class(), form_class)
+        self.assertEqual(list(form_class.base_fields), ["name", "email"])
+
+    def test_shapes_are_cached_per_filterset_class(self):
+        self.assertIsNot(CustomerFilter({"name": "a"}).get_form_class(), ProductFilter({"name": "a"}).get_form_class())
@@ -1,3 +1,172 @@
-from django.shortcuts import render
+import hashlib
+import json
+from functools import lru_cache
 
-# Create your views here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    GraphQLError,
+    OperationType,
+    execute,
+    get_operation_ast,
+    parse,
+    validate_schema,
+)
+from graphql.validation import validate
+
+from .cache import invalidate_responses, response_cache_key, response_cache_timeout
+
+
+@lru_cache(maxsize=1024)
+def parse_document(query):
+    return parse(query)
+
+
+@lru_cache(maxsize=1024)
+def validate_document(schema, query, rules):
+    return validate(schema, parse_document(query), rules, graphene_settings.MAX_VALIDATION_ERRORS)
+
+
+@lru_cache(maxsize=32)
+def introspect(schema, query, operation_name):
+    """Execute an introspection-only operation; the schema is static, so the result is too."""
+    return execute(schema, parse_document(query), operation_name=operation_name)
+
+
+def is_introspection(operation_ast):
+    """Whether an operation only selects __schema/__type/__typename with no variables."""
+    return (
+        operation_ast.operation == OperationType.QUERY
+        and not operation_ast.variable_definitions
+        and all(
+            isinstance(selection, FieldNode) and selection.name.value.startswith("__")
+            for selection in operation_ast.selection_set.selections
+        )
+    )
+
+
+def persisted_query_hash(request, data):
+    """Return the sha256Hash of an Automatic Persisted Query request, if there is one."""
+    extensions = request.GET.get("extensions") or data.get("extensions")
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    if not isinstance(extensions, dict):
+        return None
+    return (extensions.get("persistedQuery") or {}).get("sha256Hash")
+
+
+class CachedGraphQLView(GraphQLView):
+    """GraphQLView that reuses the parsed and validated document for repeated query strings.
+
+    Clients may also send only the SHA-256 of a query they registered earlier (Apollo's
+    Automatic Persisted Queries), which skips sending the query text at all. When
+    GRAPHQL_RESPONSE_CACHE_TIMEOUT is set, query responses are cached until the next committed
+    write.
+    """
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        sha256 = persisted_query_hash(request, data)
+        if sha256:
+            if query:
+                if hashlib.sha256(query.encode()).hexdigest() != sha256:
+                    return ExecutionResult(errors=[GraphQLError("provided sha does not match query")])
+                cache.set(f"graphql:apq:{sha256}", query)
+            else:
+                query = cache.get(f"graphql:apq:{sha256}")
+                if query is None:
+                    return ExecutionResult(
+                        errors=[
+                            GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+                        ]
+                    )
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        try:
+            document = parse_document(query)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    f"Can only perform a {operation_ast.operation.value} operation from a POST request.",
+                )
+            )
+
+        rules = tuple(self.validation_rules) if self.validation_rules else None
+        validation_errors = validate_document(schema, query, rules)
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        if operation_ast is not None and is_introspection(operation_ast):
+            return introspect(schema, query, operation_name)
+
+        is_mutation = operation_ast is not None and operation_ast.operation == OperationType.MUTATION
+        timeout = response_cache_timeout()
+        cache_key = None
+        if timeout and not is_mutation:
+            cache_key = response_cache_key(query, variables, operation_name)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                return ExecutionResult(data=cached_data)
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if is_mutation and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                    elif timeout:
+                        transaction.on_commit(invalidate_responses)
+                return result
+
+            result = execute(schema, document, **execute_options)
+            if timeout and is_mutation:
+                # Whatever the mutation wrote is visible once committed
+                transaction.on_commit(invalidate_responses)
+            elif cache_key and not result.errors:
+                cache.set(cache_key, result.data, timeout)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])